@@ -4,18 +4,33 @@ Qoder Reset Tool - 现代化GUI版本
 使用PyQt5实现，完全按照用户原型图设计
 """
 
+# 只在顶层导入启动必需的模块；uuid/secrets/subprocess 等只在执行
+# 操作时用到，延迟到函数内导入以缩短窗口首次显示时间
 import os
+import re
 import sys
+import stat
 import json
-import uuid
-import shutil
-import hashlib
-import subprocess
-import webbrowser
+import time
 import platform
+import threading
+import webbrowser
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import contextmanager
+from functools import lru_cache
 from pathlib import Path
 from datetime import datetime
 
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 try:
     from PyQt5.QtWidgets import *
     from PyQt5.QtCore import *
@@ -25,43 +40,348 @@ except ImportError:
     print("请运行: pip install PyQt5")
     sys.exit(1)
 
+# 平台信息在导入时确定一次，避免每次调用都重新检测
+_SYSTEM = platform.system()
+_IS_WIN = _SYSTEM == "Windows"
+_IS_MAC = _SYSTEM == "Darwin"
+_IS_LINUX = _SYSTEM == "Linux"
+
+@lru_cache(maxsize=1)
 def get_qoder_data_dir():
-    """获取Qoder数据目录的跨平台路径"""
-    system = platform.system()
+    """获取Qoder数据目录的跨平台路径（结果缓存，重复调用零开销）"""
     home_dir = Path.home()
-    
-    if system == "Darwin":  # macOS
+
+    if _IS_MAC:  # macOS
         return home_dir / "Library/Application Support/Qoder"
-    elif system == "Windows":
+    elif _IS_WIN:
         # Windows 上 Qoder 数据存储在 AppData\Roaming\Qoder
         appdata = os.getenv('APPDATA')
         if appdata:
             return Path(appdata) / "Qoder"
         else:
             return home_dir / "AppData/Roaming/Qoder"
-    elif system == "Linux":
+    elif _IS_LINUX:
         # Linux 支持（如果需要的话）
         return home_dir / ".config/Qoder"
     else:
         # 默认路径
         return home_dir / "Qoder"
 
+# 数据目录路径也只计算一次，各处直接复用
+_QODER_DATA_DIR = get_qoder_data_dir()
+
+# 检查/清理涉及的目录与文件清单，模块级 frozenset 只构建一次，
+# 并且可以和 scandir 的结果直接做集合交集
+_CACHE_DIRS = frozenset({
+    "Cache", "blob_storage", "Code Cache", "SharedClientCache",
+    "GPUCache", "DawnGraphiteCache", "DawnWebGPUCache"
+})
+
+_CHAT_DIRS = (
+    "User/workspaceStorage", "User/History", "logs", "CachedData"
+)
+
+_IDENTITY_FILES = frozenset({
+    "Network Persistent State",
+    "Cookies", "Cookies-journal",
+    "SharedStorage", "SharedStorage-wal",
+    "Trust Tokens", "Trust Tokens-journal",
+    "TransportSecurity",
+    "Preferences",
+    "Local State",  # 包含加密密钥，极其重要！
+    "NetworkDataMigrated"  # 网络数据迁移标记
+})
+
+_NETWORK_IDENTITY_FILES = frozenset({
+    "Cookies", "Cookies-journal",
+    "Network Persistent State",
+    "NetworkDataMigrated",
+    "TransportSecurity",
+    "Trust Tokens", "Trust Tokens-journal"
+})
+
+# 对话相关键名的匹配，模块级编译一次，避免每个键做四次 lower()+substring
+_CHAT_RE = re.compile(r'chat|conversation|history|session', re.IGNORECASE)
+
+def _load_json(path):
+    """读取 JSON 文件，优先使用 orjson（C 扩展，解析快数倍）"""
+    if orjson is not None:
+        return orjson.loads(Path(path).read_bytes())
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+def _atomic_write_bytes(path, data):
+    """写临时文件并 fsync 后 os.replace，写一半崩溃也不会损坏原文件"""
+    path = Path(path)
+    tmp = path.with_suffix(path.suffix + '.tmp')
+    with open(tmp, 'wb') as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+def _dump_json(path, data):
+    """序列化后原子写入 JSON 文件；内容没变化时干脆不写"""
+    if orjson is not None:
+        payload = orjson.dumps(data, option=orjson.OPT_INDENT_2)
+    else:
+        payload = json.dumps(data, indent=4, ensure_ascii=False).encode('utf-8')
+
+    try:
+        if Path(path).read_bytes() == payload:
+            return
+    except OSError:
+        pass
+    _atomic_write_bytes(path, payload)
+
+# 顶层条目数超过该值时整树交给系统命令删除，低于它不值得付出 fork 开销
+_NATIVE_RMTREE_THRESHOLD = 64
+
+def _native_rmtree(path):
+    """用系统原生命令整树删除，成功返回 True
+
+    rm -rf / rd 在原生代码里完成整个遍历，对上千文件的缓存目录比
+    Python 级逐条 unlink 快一个数量级。"""
+    import subprocess
+    run_kwargs = {}
+    if _IS_WIN:
+        cmd = ['cmd', '/c', 'rd', '/s', '/q', str(path)]
+        # 与 tasklist 备用方案相同：不在 GUI 上闪控制台窗口
+        startupinfo = subprocess.STARTUPINFO()
+        startupinfo.dwFlags |= subprocess.STARTF_USESHOWWINDOW
+        run_kwargs = {'creationflags': subprocess.CREATE_NO_WINDOW,
+                      'startupinfo': startupinfo}
+    else:
+        cmd = ['rm', '-rf', str(path)]
+    try:
+        subprocess.run(cmd, stdout=subprocess.DEVNULL,
+                       stderr=subprocess.DEVNULL, **run_kwargs)
+    except OSError:
+        return False
+    return not os.path.exists(path)
+
+def _rm_entry(func, path, errors):
+    """删除单个条目；失败时先补上写权限重试一次，仍失败则收集
+
+    缺失的条目按 EAFP 跳过。Windows 上只读文件会让 unlink 报
+    PermissionError，os.chmod(S_IWRITE) 后重试通常就能删掉；真正删不掉
+    的条目记入 errors（若提供），整棵树的删除不因单个条目中断。"""
+    try:
+        func(path)
+    except FileNotFoundError:
+        pass
+    except OSError:
+        try:
+            os.chmod(path, stat.S_IWRITE)
+            func(path)
+        except OSError as e:
+            if errors is not None:
+                errors.append((path, e))
+
+def _py_rmtree(path, errors=None):
+    """基于 os.scandir 的递归删除，删不掉的条目收集到 errors 里
+
+    DirEntry.is_dir(follow_symlinks=False) 复用 readdir 返回的类型信息，
+    省掉 3.12 之前 shutil.rmtree 对每个目录条目的额外 lstat。"""
+    # 与 shutil.rmtree 相同的顶层保护：path 本身是符号链接时只删链接，
+    # 不 scandir 进去把链接目标的内容删掉
+    if os.path.islink(path):
+        _rm_entry(os.unlink, path, errors)
+        return
+    try:
+        entries = os.scandir(path)
+    except FileNotFoundError:
+        return
+    except NotADirectoryError:
+        _rm_entry(os.unlink, path, errors)
+        return
+    except OSError as e:
+        if errors is not None:
+            errors.append((path, e))
+        return
+
+    with entries:
+        for entry in entries:
+            if entry.is_dir(follow_symlinks=False):
+                _py_rmtree(entry.path, errors)
+            else:
+                _rm_entry(os.unlink, entry.path, errors)
+    _rm_entry(os.rmdir, path, errors)
+
+def _fast_rmtree(path, errors=None):
+    """删除目录树：大目录派发给系统命令，小目录用 Python 遍历
+
+    返回 False 表示目标本来就不存在（调用方无须预先 exists()），
+    否则尝试删除并返回 True；删不掉的条目收集到 errors（若提供）。"""
+    # 顶层是符号链接（常见于把缓存目录链到其他卷）时只删链接本身，
+    # 与 rm -rf 分支和 shutil.rmtree 的行为保持一致
+    if os.path.islink(path):
+        _rm_entry(os.unlink, path, errors)
+        return True
+    entry_count = 0
+    try:
+        with os.scandir(path) as it:
+            for entry_count, _entry in enumerate(it, 1):
+                if entry_count > _NATIVE_RMTREE_THRESHOLD:
+                    break
+    except FileNotFoundError:
+        return False
+    except NotADirectoryError:
+        _rm_entry(os.unlink, path, errors)
+        return True
+    except OSError as e:
+        if errors is not None:
+            errors.append((path, e))
+        return True
+
+    if entry_count == 0:
+        # 空目录（clp、logs、Backups 等的常态）：探测用的 scandir 已经
+        # 证明没有内容，直接 rmdir，不再走一遍递归删除的 scandir
+        _rm_entry(os.rmdir, path, errors)
+        return True
+    if entry_count > _NATIVE_RMTREE_THRESHOLD and _native_rmtree(path):
+        return True
+    _py_rmtree(path, errors)
+    return True
+
+def _trash_dir(path):
+    """先把目录原子重命名，再在后台线程里真正删除
+
+    同一文件系统上 os.rename 是 O(1)，调用方立即拿回控制权；递归删除
+    的 I/O 由守护线程在关键路径之外完成。代价是删完之前临时目录还占
+    磁盘空间，对重置工具来说可以接受。"""
+    import uuid
+
+    path = Path(path)
+    tmp = path.with_name(f".{path.name}.trash-{uuid.uuid4().hex}")
+    os.rename(path, tmp)
+    threading.Thread(target=_fast_rmtree, args=(tmp,), daemon=True).start()
+
+def _unlink_many(dir_path, names):
+    """在同一目录下批量删除文件，返回 (已删除名单, [(名字, 异常), ...])
+
+    打开一次目录 fd 后用 unlinkat 删除，免去内核对每个条目重复解析完整
+    路径；平台不支持 dir_fd 时退回逐个 os.unlink。缺失的文件按 EAFP
+    直接跳过，不做 exists() 预检。"""
+    deleted, errors = [], []
+    dir_fd = None
+    if os.unlink in os.supports_dir_fd:
+        try:
+            dir_fd = os.open(str(dir_path),
+                             os.O_RDONLY | getattr(os, 'O_DIRECTORY', 0))
+        except OSError:
+            return deleted, errors  # 目录本身不存在
+    try:
+        for name in names:
+            try:
+                if dir_fd is not None:
+                    os.unlink(name, dir_fd=dir_fd)
+                else:
+                    os.unlink(os.path.join(str(dir_path), name))
+                deleted.append(name)
+            except FileNotFoundError:
+                pass
+            except OSError as e:
+                errors.append((name, e))
+    finally:
+        if dir_fd is not None:
+            os.close(dir_fd)
+    return deleted, errors
+
+def _list_dir_names(path):
+    """一次 scandir 返回目录下所有条目名的集合，目录不存在时返回空集"""
+    try:
+        with os.scandir(path) as it:
+            return {entry.name for entry in it}
+    except (FileNotFoundError, NotADirectoryError):
+        return set()
+
+def _win_list_processes():
+    """用 Win32 Toolhelp 快照直接枚举进程
+
+    不派生 tasklist 子进程，也不解析本地化文本输出，逐项产出
+    (pid, 可执行文件名)。"""
+    import ctypes
+    from ctypes import wintypes
+
+    TH32CS_SNAPPROCESS = 0x00000002
+    INVALID_HANDLE_VALUE = ctypes.c_void_p(-1).value
+
+    class PROCESSENTRY32W(ctypes.Structure):
+        _fields_ = [
+            ("dwSize", wintypes.DWORD),
+            ("cntUsage", wintypes.DWORD),
+            ("th32ProcessID", wintypes.DWORD),
+            ("th32DefaultHeapID", ctypes.c_size_t),
+            ("th32ModuleID", wintypes.DWORD),
+            ("cntThreads", wintypes.DWORD),
+            ("th32ParentProcessID", wintypes.DWORD),
+            ("pcPriClassBase", ctypes.c_long),
+            ("dwFlags", wintypes.DWORD),
+            ("szExeFile", ctypes.c_wchar * 260),
+        ]
+
+    kernel32 = ctypes.windll.kernel32
+    snapshot = kernel32.CreateToolhelp32Snapshot(TH32CS_SNAPPROCESS, 0)
+    if snapshot == INVALID_HANDLE_VALUE:
+        raise OSError("CreateToolhelp32Snapshot 失败")
+    try:
+        entry = PROCESSENTRY32W()
+        entry.dwSize = ctypes.sizeof(PROCESSENTRY32W)
+        if kernel32.Process32FirstW(snapshot, ctypes.byref(entry)):
+            while True:
+                yield entry.th32ProcessID, entry.szExeFile
+                if not kernel32.Process32NextW(snapshot, ctypes.byref(entry)):
+                    break
+    finally:
+        kernel32.CloseHandle(snapshot)
+
 def check_process_running(process_name):
     """跨平台检查进程是否运行"""
-    system = platform.system()
-    
+    # 首选 psutil：直接遍历进程表，不需要 fork pgrep/tasklist 子进程
+    if psutil is not None:
+        name_lower = process_name.lower()
+        pids = []
+        for proc in psutil.process_iter(['pid', 'name']):
+            try:
+                if name_lower in (proc.info['name'] or '').lower():
+                    pids.append(str(proc.info['pid']))
+            except (psutil.NoSuchProcess, psutil.AccessDenied):
+                continue
+        if pids:
+            return True, pids
+        return False, []
+
+    # Windows 上没有 psutil 时直接查询内核快照，仍然零子进程
+    if _IS_WIN:
+        try:
+            name_lower = process_name.lower()
+            pids = [str(pid) for pid, exe_name in _win_list_processes()
+                    if name_lower in exe_name.lower()]
+            if pids:
+                return True, pids
+            return False, []
+        except OSError:
+            pass
+
+    # 备用方案：以上都不可用时退回系统命令
+    import subprocess
     try:
-        if system == "Darwin" or system == "Linux":  # macOS/Linux
-            result = subprocess.run(['pgrep', '-f', process_name], 
+        if _IS_MAC or _IS_LINUX:  # macOS/Linux
+            result = subprocess.run(['pgrep', '-f', process_name],
                                   capture_output=True, text=True)
             if result.returncode == 0:
                 pids = result.stdout.strip().split('\n')
                 return True, pids
-        
-        elif system == "Windows":
-            # 使用 tasklist 命令
-            result = subprocess.run(['tasklist', '/FI', f'IMAGENAME eq {process_name}*'], 
-                                  capture_output=True, text=True, shell=True)
+
+        elif _IS_WIN:
+            # 使用 tasklist 命令（不经过 cmd.exe，且不闪控制台窗口）
+            startupinfo = subprocess.STARTUPINFO()
+            startupinfo.dwFlags |= subprocess.STARTF_USESHOWWINDOW
+            result = subprocess.run(['tasklist', '/FI', f'IMAGENAME eq {process_name}*'],
+                                  capture_output=True, text=True,
+                                  creationflags=subprocess.CREATE_NO_WINDOW,
+                                  startupinfo=startupinfo)
             if result.returncode == 0 and process_name.lower() in result.stdout.lower():
                 # 解析输出获取PID
                 lines = result.stdout.strip().split('\n')
@@ -72,36 +392,217 @@ def check_process_running(process_name):
                         if len(parts) >= 2:
                             pids.append(parts[1])  # PID 在第二列
                 return True, pids
-        
-    except Exception as e:
-        # 备用方案：使用 psutil（如果安装了）
+
+    except Exception:
+        pass
+
+    return False, []
+
+def _wait_for_process_exit(pids, timeout=5.0):
+    """等待给定 pid 退出，返回超时后仍存活的 pid 列表
+
+    Linux 用 pidfd + poll，macOS 用 kqueue 的 NOTE_EXIT，都是内核事件
+    驱动的等待；拿不到这些机制时退回 psutil.wait_procs 或短间隔轮询。
+    比到点再 fork 一次 pgrep/tasklist 便宜，也消除了复查的竞态窗口。"""
+    alive = set()
+    for pid in pids:
+        try:
+            alive.add(int(pid))
+        except (TypeError, ValueError):
+            continue
+    if not alive:
+        return []
+
+    deadline = time.monotonic() + timeout
+
+    if _IS_LINUX and hasattr(os, 'pidfd_open'):
+        import select
+        poller = select.poll()
+        fds = {}
+        for pid in list(alive):
+            try:
+                fd = os.pidfd_open(pid)
+            except OSError:
+                alive.discard(pid)  # 已经退出
+                continue
+            poller.register(fd, select.POLLIN)
+            fds[fd] = pid
         try:
-            import psutil
-            pids = []
-            for proc in psutil.process_iter(['pid', 'name']):
+            while fds:
+                remaining_ms = (deadline - time.monotonic()) * 1000
+                if remaining_ms <= 0:
+                    break
+                for fd, _event in poller.poll(remaining_ms):
+                    poller.unregister(fd)
+                    alive.discard(fds.pop(fd))
+                    os.close(fd)
+        finally:
+            for fd in fds:
+                os.close(fd)
+        return sorted(alive)
+
+    if _IS_MAC and hasattr(os, 'sysconf'):
+        import select
+        kq = select.kqueue()
+        try:
+            for pid in list(alive):
+                event = select.kevent(pid, filter=select.KQ_FILTER_PROC,
+                                      flags=select.KQ_EV_ADD,
+                                      fflags=select.KQ_NOTE_EXIT)
                 try:
-                    if process_name.lower() in proc.info['name'].lower():
-                        pids.append(str(proc.info['pid']))
-                except (psutil.NoSuchProcess, psutil.AccessDenied):
-                    continue
-            if pids:
-                return True, pids
-        except ImportError:
-            pass
-    
-    return False, []
+                    kq.control([event], 0)
+                except OSError:
+                    alive.discard(pid)  # 已经退出
+            while alive:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                for ev in kq.control(None, len(alive), remaining):
+                    alive.discard(ev.ident)
+        finally:
+            kq.close()
+        return sorted(alive)
+
+    if psutil is not None:
+        procs = []
+        for pid in list(alive):
+            try:
+                procs.append(psutil.Process(pid))
+            except psutil.NoSuchProcess:
+                alive.discard(pid)
+        if procs:
+            _gone, still_alive = psutil.wait_procs(
+                procs, timeout=max(0.0, deadline - time.monotonic()))
+            alive = {p.pid for p in still_alive}
+        return sorted(alive)
+
+    if _IS_WIN:
+        # Windows 的 os.kill 对普通信号是 TerminateProcess，不能当存在性
+        # 探测用；拿 SYNCHRONIZE 句柄做内核级等待，再逐个查询退出状态
+        import ctypes
+        from ctypes import wintypes
+
+        SYNCHRONIZE = 0x00100000
+        ERROR_INVALID_PARAMETER = 87
+        WAIT_OBJECT_0 = 0
+
+        kernel32 = ctypes.WinDLL('kernel32', use_last_error=True)
+        kernel32.OpenProcess.restype = wintypes.HANDLE
+        handles = {}
+        for pid in list(alive):
+            handle = kernel32.OpenProcess(SYNCHRONIZE, False, pid)
+            if handle:
+                handles[pid] = handle
+            elif ctypes.get_last_error() == ERROR_INVALID_PARAMETER:
+                alive.discard(pid)  # 已经退出
+            # 其他错误（如权限不足）：保守地认为进程仍在运行
+        try:
+            if handles:
+                arr = (wintypes.HANDLE * len(handles))(*handles.values())
+                remaining_ms = max(0, int((deadline - time.monotonic()) * 1000))
+                kernel32.WaitForMultipleObjects(len(arr), arr, True,
+                                                remaining_ms)
+                for pid, handle in handles.items():
+                    # 超时 0 的 WaitForSingleObject 只查询当前状态
+                    if kernel32.WaitForSingleObject(handle, 0) == WAIT_OBJECT_0:
+                        alive.discard(pid)
+        finally:
+            for handle in handles.values():
+                kernel32.CloseHandle(handle)
+        return sorted(alive)
+
+    # 最后手段（仅 POSIX）：短间隔轮询信号 0 的存在性探测
+    while alive and time.monotonic() < deadline:
+        for pid in list(alive):
+            try:
+                os.kill(pid, 0)
+            except OSError:
+                alive.discard(pid)
+        if alive:
+            time.sleep(0.2)
+    return sorted(alive)
+
+class ResetWorker(QObject):
+    """在后台线程中执行耗时操作，避免阻塞界面"""
+    finished = pyqtSignal(object)
+    error = pyqtSignal(str)
+
+    def __init__(self, fn):
+        super().__init__()
+        self._fn = fn
+
+    def run(self):
+        try:
+            result = self._fn()
+            self.finished.emit(result)
+        except Exception as e:
+            self.error.emit(str(e))
+
+class _TaskRunnable(QRunnable):
+    """简单的 QRunnable 包装，用于线程池执行"""
+
+    def __init__(self, fn):
+        super().__init__()
+        self._fn = fn
+
+    def run(self):
+        self._fn()
 
 class QoderResetGUI(QMainWindow):
+    log_signal = pyqtSignal(str)
+
     def __init__(self):
         super().__init__()
-        self.system = platform.system()
+        self.system = _SYSTEM
+        self._workers = []
+        self._worker_callbacks = {}
+        self._log_batch = threading.local()
+        self._storage_cache = None
+        self._proc_check_cache = (0.0, None)
+        self.log_signal.connect(self._append_log)
         self.init_ui()
-    
+
+    def _run_in_worker(self, fn, on_finished=None, on_error=None):
+        """把耗时操作移到 QThread 执行，完成后通过信号回到主线程
+
+        finished/error 只连接主窗口的绑定方法：worker 线程 emit 时 Qt
+        自动用排队连接把调用投递回 GUI 线程，再由分发槽执行各操作的
+        回调。直接连闭包会让 QMessageBox 等 GUI 调用跑在 worker 线程。"""
+        thread = QThread(self)
+        worker = ResetWorker(fn)
+        worker.moveToThread(thread)
+        thread.started.connect(worker.run)
+        self._worker_callbacks[worker] = (on_finished, on_error)
+        worker.finished.connect(self._on_worker_finished)
+        worker.error.connect(self._on_worker_error)
+        worker.finished.connect(thread.quit)
+        worker.error.connect(thread.quit)
+        thread.finished.connect(worker.deleteLater)
+        thread.finished.connect(thread.deleteLater)
+
+        # 保持引用，防止线程对象被提前回收
+        entry = (thread, worker)
+        self._workers.append(entry)
+        thread.finished.connect(lambda: self._workers.remove(entry))
+
+        thread.start()
+
+    def _on_worker_finished(self, result):
+        """在 GUI 线程中分发操作完成回调"""
+        on_finished, _ = self._worker_callbacks.pop(self.sender(), (None, None))
+        if on_finished:
+            on_finished(result)
+
+    def _on_worker_error(self, msg):
+        """在 GUI 线程中分发操作失败回调"""
+        _, on_error = self._worker_callbacks.pop(self.sender(), (None, None))
+        if on_error:
+            on_error(msg)
+
     def init_ui(self):
         """初始化用户界面"""
         self.setWindowTitle("Qoder-Free")
         self.setFixedSize(800, 1000)
-        self.setStyleSheet("background-color: white;")
         
         # 创建中央部件
         central_widget = QWidget()
@@ -114,60 +615,25 @@ class QoderResetGUI(QMainWindow):
         
         # 1. 标题
         title_label = QLabel("Qoder-Free")
+        title_label.setObjectName("titleLabel")
         title_label.setAlignment(Qt.AlignCenter)
-        title_label.setStyleSheet("""
-            QLabel {
-                font-size: 24px;
-                font-weight: bold;
-                color: black;
-                margin-bottom: 10px;
-            }
-        """)
         main_layout.addWidget(title_label)
         
         # 2. 说明文字
         intro_label = QLabel("Qoder-Free主要用于重置Qoder应用程序的用户身份信息")
+        intro_label.setObjectName("introLabel")
         intro_label.setAlignment(Qt.AlignCenter)
-        intro_label.setStyleSheet("""
-            QLabel {
-                font-size: 12px;
-                color: #666666;
-                margin-bottom: 20px;
-            }
-        """)
         main_layout.addWidget(intro_label)
         
         # 3. 操作区域标题
         operation_title = QLabel("操作区域:")
-        operation_title.setStyleSheet("""
-            QLabel {
-                font-size: 14px;
-                font-weight: bold;
-                color: black;
-                margin-bottom: 10px;
-            }
-        """)
+        operation_title.setObjectName("operationTitle")
         main_layout.addWidget(operation_title)
         
         # 4. 蓝色横幅按钮
         self.one_click_btn = QPushButton("一键修改配置")
+        self.one_click_btn.setObjectName("oneClickBtn")
         self.one_click_btn.setFixedSize(300, 40)  # 设置固定宽度300px，高度40px
-        self.one_click_btn.setStyleSheet("""
-            QPushButton {
-                background-color: #4285f4;
-                color: white;
-                font-size: 14px;
-                font-weight: bold;
-                border: none;
-                border-radius: 5px;
-            }
-            QPushButton:hover {
-                background-color: #3367d6;
-            }
-            QPushButton:pressed {
-                background-color: #2851a3;
-            }
-        """)
         self.one_click_btn.clicked.connect(self.one_click_reset)
         
         # 将按钮居中显示
@@ -186,45 +652,15 @@ class QoderResetGUI(QMainWindow):
         
         # 关闭Qoder按钮 (红色)
         self.close_qoder_btn = QPushButton("关闭Qoder")
+        self.close_qoder_btn.setObjectName("closeQoderBtn")
         self.close_qoder_btn.setFixedSize(150, 40)
-        self.close_qoder_btn.setStyleSheet("""
-            QPushButton {
-                background-color: #ea4335;
-                color: white;
-                font-size: 12px;
-                font-weight: bold;
-                border: none;
-                border-radius: 5px;
-            }
-            QPushButton:hover {
-                background-color: #d33b2c;
-            }
-            QPushButton:pressed {
-                background-color: #b52d20;
-            }
-        """)
         self.close_qoder_btn.clicked.connect(self.close_qoder)
         button_row1.addWidget(self.close_qoder_btn)
         
         # 重置机器ID按钮 (蓝色)
         self.reset_machine_id_btn = QPushButton("重置机器ID")
+        self.reset_machine_id_btn.setObjectName("resetMachineIdBtn")
         self.reset_machine_id_btn.setFixedSize(150, 40)
-        self.reset_machine_id_btn.setStyleSheet("""
-            QPushButton {
-                background-color: #4285f4;
-                color: white;
-                font-size: 12px;
-                font-weight: bold;
-                border: none;
-                border-radius: 5px;
-            }
-            QPushButton:hover {
-                background-color: #3367d6;
-            }
-            QPushButton:pressed {
-                background-color: #2851a3;
-            }
-        """)
         self.reset_machine_id_btn.clicked.connect(self.reset_machine_id)
         button_row1.addWidget(self.reset_machine_id_btn)
         
@@ -236,45 +672,15 @@ class QoderResetGUI(QMainWindow):
         
         # 重置遥测数据按钮 (蓝色)
         self.reset_telemetry_btn = QPushButton("重置遥测数据")
+        self.reset_telemetry_btn.setObjectName("resetTelemetryBtn")
         self.reset_telemetry_btn.setFixedSize(150, 40)
-        self.reset_telemetry_btn.setStyleSheet("""
-            QPushButton {
-                background-color: #4285f4;
-                color: white;
-                font-size: 12px;
-                font-weight: bold;
-                border: none;
-                border-radius: 5px;
-            }
-            QPushButton:hover {
-                background-color: #3367d6;
-            }
-            QPushButton:pressed {
-                background-color: #2851a3;
-            }
-        """)
         self.reset_telemetry_btn.clicked.connect(self.reset_telemetry)
         button_row2.addWidget(self.reset_telemetry_btn)
         
         # 深度身份清理按钮 (橙色，新增)
         self.deep_clean_btn = QPushButton("深度身份清理")
+        self.deep_clean_btn.setObjectName("deepCleanBtn")
         self.deep_clean_btn.setFixedSize(150, 40)
-        self.deep_clean_btn.setStyleSheet("""
-            QPushButton {
-                background-color: #ff9800;
-                color: white;
-                font-size: 12px;
-                font-weight: bold;
-                border: none;
-                border-radius: 5px;
-            }
-            QPushButton:hover {
-                background-color: #f57c00;
-            }
-            QPushButton:pressed {
-                background-color: #e65100;
-            }
-        """)
         self.deep_clean_btn.clicked.connect(self.deep_identity_cleanup)
         button_row2.addWidget(self.deep_clean_btn)
         
@@ -283,30 +689,8 @@ class QoderResetGUI(QMainWindow):
 
         # 5.5. 保留对话记录勾选框
         self.preserve_chat_checkbox = QCheckBox("保留对话记录")
+        self.preserve_chat_checkbox.setObjectName("preserveChatCheckbox")
         self.preserve_chat_checkbox.setChecked(True)  # 默认勾选
-        self.preserve_chat_checkbox.setStyleSheet("""
-            QCheckBox {
-                color: black;
-                font-size: 12px;
-                font-weight: bold;
-                spacing: 8px;
-            }
-            QCheckBox::indicator {
-                width: 16px;
-                height: 16px;
-                border: 2px solid #4285f4;
-                border-radius: 3px;
-                background-color: white;
-            }
-            QCheckBox::indicator:checked {
-                background-color: #4285f4;
-                border: 2px solid #4285f4;
-            }
-            QCheckBox::indicator:checked:hover {
-                background-color: #3367d6;
-                border: 2px solid #3367d6;
-            }
-        """)
 
         checkbox_layout = QHBoxLayout()
         checkbox_layout.addWidget(self.preserve_chat_checkbox)
@@ -315,31 +699,13 @@ class QoderResetGUI(QMainWindow):
 
         # 6. 操作日志区域
         log_title = QLabel("操作日志:")
-        log_title.setStyleSheet("""
-            QLabel {
-                font-size: 14px;
-                font-weight: bold;
-                color: black;
-                margin-top: 10px;
-                margin-bottom: 10px;
-            }
-        """)
+        log_title.setObjectName("logTitle")
         main_layout.addWidget(log_title)
         
         # 日志文本框
         self.log_text = QTextEdit()
+        self.log_text.setObjectName("logText")
         self.log_text.setFixedHeight(380)  # 设置固定高度以显示更多日志行
-        self.log_text.setStyleSheet("""
-            QTextEdit {
-                background-color: #f8f9fa;
-                color: #333333;
-                border: 1px solid #dadce0;
-                border-radius: 5px;
-                font-family: 'Monaco', 'Menlo', 'Courier New', monospace;
-                font-size: 11px;
-                padding: 10px;
-            }
-        """)
         self.log_text.setReadOnly(True)
         main_layout.addWidget(self.log_text)
         
@@ -348,23 +714,8 @@ class QoderResetGUI(QMainWindow):
         clear_layout.addStretch()
         
         self.clear_log_btn = QPushButton("清空日志")
+        self.clear_log_btn.setObjectName("clearLogBtn")
         self.clear_log_btn.setFixedSize(100, 30)
-        self.clear_log_btn.setStyleSheet("""
-            QPushButton {
-                background-color: #9aa0a6;
-                color: white;
-                font-size: 11px;
-                font-weight: bold;
-                border: none;
-                border-radius: 5px;
-            }
-            QPushButton:hover {
-                background-color: #80868b;
-            }
-            QPushButton:pressed {
-                background-color: #5f6368;
-            }
-        """)
         self.clear_log_btn.clicked.connect(self.clear_log)
         clear_layout.addWidget(self.clear_log_btn)
         
@@ -372,23 +723,8 @@ class QoderResetGUI(QMainWindow):
         
         # 7. 底部GitHub链接
         github_btn = QPushButton("Github")
+        github_btn.setObjectName("githubBtn")
         github_btn.setFixedSize(120, 40)
-        github_btn.setStyleSheet("""
-            QPushButton {
-                background-color: #333333;
-                color: white;
-                font-size: 11px;
-                font-weight: bold;
-                border: none;
-                border-radius: 5px;
-            }
-            QPushButton:hover {
-                background-color: #555555;
-            }
-            QPushButton:pressed {
-                background-color: #222222;
-            }
-        """)
         github_btn.clicked.connect(self.open_github)
         
         github_layout = QHBoxLayout()
@@ -400,13 +736,43 @@ class QoderResetGUI(QMainWindow):
         # 添加初始日志
         self.log("Qoder-Free 重置工具已启动")
         self.log("=" * 50)
-        self.initialize_status_check()
-    
+        # 启动状态检查放到线程池，让窗口先显示出来
+        QThreadPool.globalInstance().start(_TaskRunnable(self.initialize_status_check))
+
     def log(self, message):
-        """添加日志消息"""
+        """添加日志消息（可从任意线程调用，通过信号回到主线程）"""
         timestamp = datetime.now().strftime("%H:%M:%S")
         log_message = f"[{timestamp}] {message}"
+        buffer = getattr(self._log_batch, 'buffer', None)
+        if buffer is not None:
+            buffer.append(log_message)
+        else:
+            self.log_signal.emit(log_message)
+
+    @contextmanager
+    def batch_log(self):
+        """批量收集当前线程的日志，退出时一次性写入文本框
+
+        缓冲是线程本地的：worker 的批次只拦截该 worker 自己的 log()，
+        其他线程（比如主线程的按钮日志）照常即时发出，也不存在多线程
+        并发修改同一个计数器/列表的竞态。嵌套批次沿用最外层的缓冲。"""
+        state = self._log_batch
+        outer = getattr(state, 'buffer', None)
+        if outer is None:
+            state.buffer = []
+        try:
+            yield
+        finally:
+            if outer is None:
+                buffered, state.buffer = state.buffer, None
+                if buffered:
+                    self.log_signal.emit('\n'.join(buffered))
+
+    def _append_log(self, log_message):
+        """在主线程中把日志写入文本框"""
+        self.log_text.setUpdatesEnabled(False)
         self.log_text.append(log_message)
+        self.log_text.setUpdatesEnabled(True)
 
         # 自动滚动到最新日志
         scrollbar = self.log_text.verticalScrollBar()
@@ -417,160 +783,194 @@ class QoderResetGUI(QMainWindow):
         self.log_text.clear()
         self.log("日志已清空")
 
+    def _load_storage(self, storage_path):
+        """读取 storage.json，按 mtime 缓存解析结果
+
+        启动状态检查已经解析过一次，之后的重置操作直接复用缓存；
+        文件被外部修改（mtime 变化）时自动失效。"""
+        st = os.stat(storage_path)
+        if self._storage_cache and self._storage_cache[0] == st.st_mtime_ns:
+            return self._storage_cache[1]
+        data = _load_json(storage_path)
+        self._storage_cache = (st.st_mtime_ns, data)
+        return data
+
+    def _save_storage(self, storage_path, data):
+        """写回 storage.json 并刷新缓存"""
+        _dump_json(storage_path, data)
+        self._storage_cache = (os.stat(storage_path).st_mtime_ns, data)
+
     def initialize_status_check(self):
         """初始化时检查各项状态"""
-        try:
-            # 1. 检查Qoder进程状态
-            self.log("1. 检查Qoder进程状态...")
-            is_running, pids = self.check_qoder_running()
-            if is_running:
-                self.log(f"   ✅ Qoder正在运行 (PID: {', '.join(pids)})")
-            else:
-                self.log("   ✅ Qoder未运行")
-
-            # 2. 检查Qoder目录
-            self.log("2. 检查Qoder目录...")
-            qoder_support_dir = get_qoder_data_dir()
-
-            if qoder_support_dir.exists():
-                self.log(f"   ✅ Qoder目录存在")
-
-                # 3. 检查机器ID文件
-                self.log("3. 检查机器ID文件...")
-                machine_id_file = qoder_support_dir / "machineid"
-                if machine_id_file.exists():
-                    try:
-                        with open(machine_id_file, 'r') as f:
-                            current_id = f.read().strip()
-                        self.log(f"   ✅ 机器ID: {current_id}")
-                    except Exception as e:
-                        self.log(f"   ❌ 读取机器ID失败: {e}")
+        with self.batch_log():
+            try:
+                # 1. 检查Qoder进程状态
+                self.log("1. 检查Qoder进程状态...")
+                is_running, pids = self._is_qoder_running()
+                if is_running:
+                    self.log(f"   ✅ Qoder正在运行 (PID: {', '.join(pids)})")
                 else:
-                    self.log("   ❌ 机器ID文件不存在")
-
-                # 4. 检查遥测数据文件
-                self.log("4. 检查遥测数据文件...")
-                storage_json_file = qoder_support_dir / "User/globalStorage/storage.json"
-                if storage_json_file.exists():
-                    try:
-                        with open(storage_json_file, 'r', encoding='utf-8') as f:
-                            data = json.load(f)
-
-                        if 'telemetry.machineId' in data:
-                            machine_id = data['telemetry.machineId']
-                            self.log(f"   ✅ 遥测机器ID: {machine_id[:16]}...")
-                        else:
-                            self.log("   ⚠️  未找到遥测机器ID")
-
-                        if 'telemetry.devDeviceId' in data:
-                            device_id = data['telemetry.devDeviceId']
-                            self.log(f"   ✅ 设备ID: {device_id}")
-                        else:
-                            self.log("   ⚠️  未找到设备ID")
-
-                    except Exception as e:
-                        self.log(f"   ❌ 读取遥测数据失败: {e}")
-                else:
-                    self.log("   ❌ 遥测数据文件不存在")
-
-                # 5. 检查缓存目录
-                self.log("5. 检查缓存目录...")
-                cache_dirs = [
-                    "Cache", "blob_storage", "Code Cache", "SharedClientCache",
-                    "GPUCache", "DawnGraphiteCache", "DawnWebGPUCache"
-                ]
-
-                cache_count = 0
-                for cache_dir in cache_dirs:
-                    cache_path = qoder_support_dir / cache_dir
-                    if cache_path.exists():
-                        cache_count += 1
-
-                self.log(f"   ✅ 发现 {cache_count}/{len(cache_dirs)} 个缓存目录")
-
-                # 6. 检查对话记录相关目录
-                self.log("6. 检查对话记录...")
-                chat_dirs = [
-                    "User/workspaceStorage", "User/History", "logs", "CachedData"
-                ]
-
-                chat_count = 0
-                for chat_dir in chat_dirs:
-                    chat_path = qoder_support_dir / chat_dir
-                    if chat_path.exists():
-                        chat_count += 1
-
-                self.log(f"   ✅ 发现 {chat_count}/{len(chat_dirs)} 个对话相关目录")
-                
-                # 7. 检查身份识别文件（更新）
-                self.log("7. 检查身份识别文件...")
-                identity_files = [
-                    "Local State",  # 包含加密密钥 - 新增
-                    "Preferences",
-                    "SharedStorage", 
-                    "SharedStorage-wal"
-                ]
-                
-                identity_count = 0
-                for identity_file in identity_files:
-                    file_path = qoder_support_dir / identity_file
-                    if file_path.exists():
-                        identity_count += 1
-                
-                # 检查 Network 目录中的身份文件
-                network_dir = qoder_support_dir / "Network"
-                network_identity_files = [
-                    "Cookies", "Network Persistent State", "Trust Tokens", 
-                    "TransportSecurity", "NetworkDataMigrated"
-                ]
-                network_count = 0
-                if network_dir.exists():
-                    for network_file in network_identity_files:
-                        file_path = network_dir / network_file
-                        if file_path.exists():
-                            network_count += 1
-                
-                self.log(f"   ✅ 发现 {identity_count}/{len(identity_files)} 个根目录身份文件")
-                self.log(f"   ✅ 发现 {network_count}/{len(network_identity_files)} 个网络身份文件")
-                
-                # 8. 检查 SharedClientCache 内部文件
-                self.log("8. 检查 SharedClientCache 内部文件...")
-                shared_cache = qoder_support_dir / "SharedClientCache"
-                if shared_cache.exists():
-                    critical_files = [".info", ".lock", "mcp.json"]
-                    shared_count = 0
-                    for file_name in critical_files:
-                        if (shared_cache / file_name).exists():
+                    self.log("   ✅ Qoder未运行")
+
+                # 2. 检查Qoder目录
+                self.log("2. 检查Qoder目录...")
+                qoder_support_dir = _QODER_DATA_DIR
+
+                if qoder_support_dir.exists():
+                    self.log(f"   ✅ Qoder目录存在")
+
+                    # 3. 检查机器ID文件
+                    self.log("3. 检查机器ID文件...")
+                    machine_id_file = qoder_support_dir / "machineid"
+                    if machine_id_file.exists():
+                        try:
+                            with open(machine_id_file, 'r') as f:
+                                current_id = f.read().strip()
+                            self.log(f"   ✅ 机器ID: {current_id}")
+                        except Exception as e:
+                            self.log(f"   ❌ 读取机器ID失败: {e}")
+                    else:
+                        self.log("   ❌ 机器ID文件不存在")
+
+                    # 4. 检查遥测数据文件
+                    self.log("4. 检查遥测数据文件...")
+                    storage_json_file = qoder_support_dir / "User/globalStorage/storage.json"
+                    if storage_json_file.exists():
+                        try:
+                            data = self._load_storage(storage_json_file)
+
+                            if 'telemetry.machineId' in data:
+                                machine_id = data['telemetry.machineId']
+                                self.log(f"   ✅ 遥测机器ID: {machine_id[:16]}...")
+                            else:
+                                self.log("   ⚠️  未找到遥测机器ID")
+
+                            if 'telemetry.devDeviceId' in data:
+                                device_id = data['telemetry.devDeviceId']
+                                self.log(f"   ✅ 设备ID: {device_id}")
+                            else:
+                                self.log("   ⚠️  未找到设备ID")
+
+                        except Exception as e:
+                            self.log(f"   ❌ 读取遥测数据失败: {e}")
+                    else:
+                        self.log("   ❌ 遥测数据文件不存在")
+
+                    # 一次 scandir 列出根目录条目，后面的检查用集合成员判断
+                    # 代替逐个 stat
+                    root_entries = _list_dir_names(qoder_support_dir)
+                    user_entries = _list_dir_names(qoder_support_dir / "User") \
+                        if "User" in root_entries else set()
+
+                    # 5. 检查缓存目录
+                    self.log("5. 检查缓存目录...")
+                    cache_count = len(_CACHE_DIRS & root_entries)
+                    self.log(f"   ✅ 发现 {cache_count}/{len(_CACHE_DIRS)} 个缓存目录")
+
+                    # 6. 检查对话记录相关目录
+                    self.log("6. 检查对话记录...")
+                    chat_count = 0
+                    for chat_dir in _CHAT_DIRS:
+                        parent, _, child = chat_dir.partition('/')
+                        if child:
+                            if child in user_entries:
+                                chat_count += 1
+                        elif parent in root_entries:
+                            chat_count += 1
+
+                    self.log(f"   ✅ 发现 {chat_count}/{len(_CHAT_DIRS)} 个对话相关目录")
+
+                    # 7. 检查身份识别文件（更新）
+                    self.log("7. 检查身份识别文件...")
+                    identity_count = len(_IDENTITY_FILES & root_entries)
+
+                    # 检查 Network 目录中的身份文件
+                    network_count = 0
+                    if "Network" in root_entries:
+                        network_entries = _list_dir_names(qoder_support_dir / "Network")
+                        network_count = len(_NETWORK_IDENTITY_FILES & network_entries)
+
+                    self.log(f"   ✅ 发现 {identity_count}/{len(_IDENTITY_FILES)} 个根目录身份文件")
+                    self.log(f"   ✅ 发现 {network_count}/{len(_NETWORK_IDENTITY_FILES)} 个网络身份文件")
+
+                    # 8. 检查 SharedClientCache 内部文件
+                    self.log("8. 检查 SharedClientCache 内部文件...")
+                    if "SharedClientCache" in root_entries:
+                        shared_entries = _list_dir_names(qoder_support_dir / "SharedClientCache")
+                        critical_files = [".info", ".lock", "mcp.json"]
+                        shared_count = sum(1 for file_name in critical_files
+                                           if file_name in shared_entries)
+
+                        # 检查 index 目录
+                        if "index" in shared_entries:
                             shared_count += 1
-                    
-                    # 检查 index 目录
-                    if (shared_cache / "index").exists():
-                        shared_count += 1
-                    
-                    self.log(f"   ✅ SharedClientCache 内部文件: {shared_count}/4 个")
-                else:
-                    self.log("   ⚠️  SharedClientCache 目录不存在")
 
-            else:
-                self.log("   ❌ Qoder目录不存在")
-                self.log("   请确保已安装Qoder应用程序")
+                        self.log(f"   ✅ SharedClientCache 内部文件: {shared_count}/4 个")
+                    else:
+                        self.log("   ⚠️  SharedClientCache 目录不存在")
 
-            self.log("=" * 50)
-            self.log("状态检查完成，可以开始操作")
+                else:
+                    self.log("   ❌ Qoder目录不存在")
+                    self.log("   请确保已安装Qoder应用程序")
 
-        except Exception as e:
-            self.log(f"❌ 状态检查失败: {e}")
-            self.log("=" * 50)
+                self.log("=" * 50)
+                self.log("状态检查完成，可以开始操作")
+
+            except Exception as e:
+                self.log(f"❌ 状态检查失败: {e}")
+                self.log("=" * 50)
     
     def check_qoder_running(self):
         """检查Qoder是否正在运行"""
         return check_process_running('Qoder')
 
+    def _is_qoder_running(self, max_age=2.0):
+        """检查 Qoder 是否在运行，结果缓存几秒
+
+        同一次点击流程里往往要查询多次，短缓存避免重复扫描进程表。"""
+        ts, result = self._proc_check_cache
+        if result is not None and time.monotonic() - ts < max_age:
+            return result
+        result = self.check_qoder_running()
+        self._proc_check_cache = (time.monotonic(), result)
+        return result
+
+    def _require_qoder_closed(self, action_name):
+        """确认 Qoder 已关闭；在运行时提示用户手动关闭
+
+        返回 (是否继续, 需要等待退出的 pid 列表)。只做对话框交互，
+        真正的等待由 worker 任务开头的 _await_qoder_exit 完成，
+        避免在 GUI 线程里阻塞事件循环。"""
+        is_running, pids = self._is_qoder_running()
+        if not is_running:
+            return True, []
+
+        reply = QMessageBox.question(self, "检测到 Qoder 正在运行",
+                                   f"检测到 Qoder 正在运行 (PID: {', '.join(pids)})\n\n"
+                                   f"{action_name}需要先关闭 Qoder。\n"
+                                   "请手动关闭后点击'Yes'继续。",
+                                   QMessageBox.Yes | QMessageBox.No)
+        if reply != QMessageBox.Yes:
+            self.log("用户取消操作")
+            return False, []
+
+        self._proc_check_cache = (0.0, None)
+        return True, pids
+
+    def _await_qoder_exit(self, pids):
+        """在 worker 线程中等待第一次检查拿到的 pid 真正退出
+
+        超时后仍有存活进程时抛异常，经 error 信号回到 GUI 线程提示。"""
+        alive = _wait_for_process_exit(pids, timeout=5.0)
+        if alive:
+            self.log("Qoder 仍在运行，操作取消")
+            raise Exception("请先完全关闭 Qoder 应用程序")
+
     def close_qoder(self):
         """关闭Qoder"""
         self.log("正在检查 Qoder 运行状态...")
 
-        is_running, pids = self.check_qoder_running()
+        is_running, pids = self._is_qoder_running()
 
         if is_running:
             self.log(f"检测到 Qoder 正在运行 (PID: {', '.join(pids)})")
@@ -589,23 +989,9 @@ class QoderResetGUI(QMainWindow):
         self.log("开始深度身份清理...")
 
         # 检查Qoder是否在运行
-        is_running, pids = self.check_qoder_running()
-        if is_running:
-            reply = QMessageBox.question(self, "检测到 Qoder 正在运行",
-                                       f"检测到 Qoder 正在运行 (PID: {', '.join(pids)})\n\n"
-                                       "深度清理需要先关闭 Qoder。\n"
-                                       "请手动关闭后点击'Yes'继续。",
-                                       QMessageBox.Yes | QMessageBox.No)
-            if reply != QMessageBox.Yes:
-                self.log("用户取消操作")
-                return
-
-            # 再次检查
-            is_running, _ = self.check_qoder_running()
-            if is_running:
-                self.log("Qoder 仍在运行，操作取消")
-                QMessageBox.critical(self, "错误", "请先完全关闭 Qoder 应用程序")
-                return
+        proceed, waiting_pids = self._require_qoder_closed("深度清理")
+        if not proceed:
+            return
 
         # 确认操作
         reply = QMessageBox.question(self, "确认深度清理",
@@ -621,124 +1007,128 @@ class QoderResetGUI(QMainWindow):
             self.log("用户取消深度清理")
             return
 
-        try:
-            qoder_support_dir = get_qoder_data_dir()
-            
+        def task():
+            self._await_qoder_exit(waiting_pids)
+            qoder_support_dir = _QODER_DATA_DIR
+
             if not qoder_support_dir.exists():
                 raise Exception("未找到 Qoder 应用数据目录")
-            
+
             self.log("=" * 40)
             self.log("开始深度身份清理")
             self.log("=" * 40)
-            
-            # 执行高级身份清理
-            self.perform_advanced_identity_cleanup(qoder_support_dir)
-            
+
+            # 收集并执行高级身份清理计划
+            plan = []
+            self.perform_advanced_identity_cleanup(qoder_support_dir, plan)
+            cleaned = self._execute_delete_plan(plan)
+
             self.log("=" * 40)
-            self.log("深度身份清理完成！")
+            self.log(f"深度身份清理完成！清除了 {cleaned} 个项目")
             self.log("=" * 40)
-            
+
+        def done(_):
             QMessageBox.information(self, "完成", "深度身份清理完成！\n现在可以重新启动 Qoder。")
-            
-        except Exception as e:
-            self.log(f"深度清理失败: {e}")
-            QMessageBox.critical(self, "错误", f"深度清理失败: {e}")
+
+        def fail(msg):
+            self.log(f"深度清理失败: {msg}")
+            QMessageBox.critical(self, "错误", f"深度清理失败: {msg}")
+
+        self._run_in_worker(task, done, fail)
 
     def reset_machine_id(self):
         """重置机器ID"""
         self.log("开始重置机器ID...")
 
         # 检查Qoder是否在运行
-        is_running, _ = self.check_qoder_running()
+        is_running, _ = self._is_qoder_running()
         if is_running:
             self.log("错误: Qoder 正在运行，请先关闭")
             QMessageBox.critical(self, "错误", "请先关闭 Qoder 应用程序")
             return
 
-        try:
-            qoder_support_dir = get_qoder_data_dir()
+        def task():
+            qoder_support_dir = _QODER_DATA_DIR
             machine_id_file = qoder_support_dir / "machineid"
 
             if not qoder_support_dir.exists():
                 raise Exception("未找到 Qoder 应用数据目录")
 
-            if machine_id_file.exists():
-                new_machine_id = str(uuid.uuid4())
-                with open(machine_id_file, 'w') as f:
-                    f.write(new_machine_id)
-                self.log(f"机器ID已重置为: {new_machine_id}")
+            if not machine_id_file.exists():
+                self.log("未找到机器ID文件")
+                return False
+
+            import uuid
+            new_machine_id = str(uuid.uuid4())
+            _atomic_write_bytes(machine_id_file, new_machine_id.encode())
+            self.log(f"机器ID已重置为: {new_machine_id}")
+            return True
+
+        def done(ok):
+            if ok:
                 QMessageBox.information(self, "成功", "机器ID重置完成")
             else:
-                self.log("未找到机器ID文件")
                 QMessageBox.warning(self, "警告", "未找到机器ID文件")
 
-        except Exception as e:
-            self.log(f"重置机器ID失败: {e}")
-            QMessageBox.critical(self, "错误", f"重置机器ID失败: {e}")
+        def fail(msg):
+            self.log(f"重置机器ID失败: {msg}")
+            QMessageBox.critical(self, "错误", f"重置机器ID失败: {msg}")
+
+        self._run_in_worker(task, done, fail)
 
     def reset_telemetry(self):
         """重置遥测数据"""
         self.log("开始重置遥测数据...")
 
         # 检查Qoder是否在运行
-        is_running, _ = self.check_qoder_running()
+        is_running, _ = self._is_qoder_running()
         if is_running:
             self.log("错误: Qoder 正在运行，请先关闭")
             QMessageBox.critical(self, "错误", "请先关闭 Qoder 应用程序")
             return
 
-        try:
-            qoder_support_dir = get_qoder_data_dir()
+        def task():
+            qoder_support_dir = _QODER_DATA_DIR
             storage_json_file = qoder_support_dir / "User/globalStorage/storage.json"
 
             if not storage_json_file.exists():
                 raise Exception("未找到遥测数据文件")
 
-            with open(storage_json_file, 'r', encoding='utf-8') as f:
-                data = json.load(f)
+            data = self._load_storage(storage_json_file)
 
-            # 生成新的遥测ID
-            new_uuid = str(uuid.uuid4())
-            machine_id_hash = hashlib.sha256(new_uuid.encode()).hexdigest()
+            # 生成新的遥测ID；输入本来就是随机数，直接取 64 位 hex
+            # 即可，不必再过一遍 SHA-256
+            import secrets
+            import uuid
+            machine_id_hash = secrets.token_hex(32)
             device_id = str(uuid.uuid4())
 
             data['telemetry.machineId'] = machine_id_hash
             data['telemetry.devDeviceId'] = device_id
 
-            with open(storage_json_file, 'w', encoding='utf-8') as f:
-                json.dump(data, f, indent=4, ensure_ascii=False)
+            self._save_storage(storage_json_file, data)
 
             self.log("遥测数据已重置")
             self.log(f"新遥测机器ID: {machine_id_hash[:16]}...")
             self.log(f"新设备ID: {device_id}")
+
+        def done(_):
             QMessageBox.information(self, "成功", "遥测数据重置完成")
 
-        except Exception as e:
-            self.log(f"重置遥测数据失败: {e}")
-            QMessageBox.critical(self, "错误", f"重置遥测数据失败: {e}")
+        def fail(msg):
+            self.log(f"重置遥测数据失败: {msg}")
+            QMessageBox.critical(self, "错误", f"重置遥测数据失败: {msg}")
+
+        self._run_in_worker(task, done, fail)
 
     def one_click_reset(self):
         """一键修改所有配置"""
         self.log("开始一键修改所有配置...")
 
         # 检查Qoder是否在运行
-        is_running, pids = self.check_qoder_running()
-        if is_running:
-            reply = QMessageBox.question(self, "检测到 Qoder 正在运行",
-                                       f"检测到 Qoder 正在运行 (PID: {', '.join(pids)})\n\n"
-                                       "一键修改需要先关闭 Qoder。\n"
-                                       "请手动关闭后点击'Yes'继续。",
-                                       QMessageBox.Yes | QMessageBox.No)
-            if reply != QMessageBox.Yes:
-                self.log("用户取消操作")
-                return
-
-            # 再次检查
-            is_running, _ = self.check_qoder_running()
-            if is_running:
-                self.log("Qoder 仍在运行，操作取消")
-                QMessageBox.critical(self, "错误", "请先完全关闭 Qoder 应用程序")
-                return
+        proceed, waiting_pids = self._require_qoder_closed("一键修改")
+        if not proceed:
+            return
 
         # 确认操作
         preserve_chat = self.preserve_chat_checkbox.isChecked()
@@ -758,334 +1148,304 @@ class QoderResetGUI(QMainWindow):
             self.log("用户取消一键修改")
             return
 
-        try:
+        def task():
+            self._await_qoder_exit(waiting_pids)
             self.log("=" * 40)
             self.log("开始一键修改所有配置")
             self.log("=" * 40)
 
             # 执行重置操作
-            preserve_chat = self.preserve_chat_checkbox.isChecked()
             self.perform_full_reset(preserve_chat)
 
             self.log("=" * 40)
             self.log("一键修改完成！")
             self.log("=" * 40)
 
+        def done(_):
             QMessageBox.information(self, "完成", "一键修改所有配置完成！\n现在可以重新启动 Qoder。")
 
-        except Exception as e:
-            self.log(f"一键修改失败: {e}")
-            QMessageBox.critical(self, "错误", f"一键修改失败: {e}")
+        def fail(msg):
+            self.log(f"一键修改失败: {msg}")
+            QMessageBox.critical(self, "错误", f"一键修改失败: {msg}")
+
+        self._run_in_worker(task, done, fail)
+
+    def _queue_delete(self, plan, kind, label, path):
+        """把一个删除目标排入计划列表，kind 为 'file' 或 'dir'"""
+        plan.append((kind, label, str(path)))
+
+    def _execute_delete_plan(self, plan):
+        """执行一份删除计划，返回实际清除的项目数。
+
+        计划是每次操作自己的局部列表，不挂在实例上，避免一次操作排入
+        的目标泄漏到下一次操作里。入队时允许重复（例如 Session Storage
+        既在存储目录列表里又在对话清理里），这里按规范化路径去重后只
+        删一次；文件按父目录分组，每个目录只打开一次 fd 批量 unlink；
+        目录删除互不嵌套，派发到线程池并行执行。"""
+        seen = set()
+        file_groups = {}   # 父目录 -> [(文件名, 日志标签)]
+        dir_targets = []   # [(日志标签, 路径)]
+        for kind, label, path in plan:
+            key = os.path.normpath(path)
+            if key in seen:
+                continue
+            seen.add(key)
+            if kind == 'file':
+                parent, name = os.path.split(key)
+                file_groups.setdefault(parent, []).append((name, label))
+            else:
+                dir_targets.append((label, key))
+
+        cleaned = 0
+        for parent, entries in file_groups.items():
+            labels = dict(entries)
+            deleted, errors = _unlink_many(parent, [name for name, _ in entries])
+            for name in deleted:
+                self.log(f"   已清除: {labels[name]}")
+            for name, e in errors:
+                self.log(f"   清除失败 {labels[name]}: {e}")
+            cleaned += len(deleted)
+
+        if dir_targets:
+            # 删不掉的条目由各 worker 收集到同一个列表（append 有 GIL
+            # 保护），结束后只发一条汇总日志，不在删除热路径上逐条打印
+            rm_errors = []
+            with ThreadPoolExecutor(
+                    max_workers=min(8, os.cpu_count() or 4)) as ex:
+                futures = {ex.submit(_fast_rmtree, p, rm_errors): label
+                           for label, p in dir_targets}
+                # 日志统一在 as_completed 循环里发，worker 本身不打日志；
+                # 不存在的目录由 _fast_rmtree 返回 False，静默跳过
+                for future in as_completed(futures):
+                    label = futures[future]
+                    exc = future.exception()
+                    if exc is not None:
+                        self.log(f"   清除失败 {label}: {exc}")
+                    elif future.result():
+                        self.log(f"   已清除: {label}")
+                        cleaned += 1
+            if rm_errors:
+                path, e = rm_errors[0]
+                self.log(f"   有 {len(rm_errors)} 个条目未能删除，"
+                         f"例如 {path}: {e}")
+        return cleaned
 
     def perform_full_reset(self, preserve_chat=True):
         """执行完整重置"""
-        qoder_support_dir = get_qoder_data_dir()
+        import secrets
+        import uuid
 
-        if not qoder_support_dir.exists():
-            raise Exception("未找到 Qoder 应用数据目录")
+        with self.batch_log():
+            qoder_support_dir = _QODER_DATA_DIR
 
-        # 1. 重置机器ID
-        self.log("1. 重置机器ID...")
-        machine_id_file = qoder_support_dir / "machineid"
-        if machine_id_file.exists():
-            new_machine_id = str(uuid.uuid4())
-            with open(machine_id_file, 'w') as f:
-                f.write(new_machine_id)
-            self.log("   机器ID已重置")
-
-        # 2. 重置遥测数据
-        self.log("2. 重置遥测数据...")
-        storage_json_file = qoder_support_dir / "User/globalStorage/storage.json"
-        if storage_json_file.exists():
-            with open(storage_json_file, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-
-            new_uuid = str(uuid.uuid4())
-            machine_id_hash = hashlib.sha256(new_uuid.encode()).hexdigest()
-            device_id = str(uuid.uuid4())
+            if not qoder_support_dir.exists():
+                raise Exception("未找到 Qoder 应用数据目录")
 
-            data['telemetry.machineId'] = machine_id_hash
-            data['telemetry.devDeviceId'] = device_id
+            # 1. 重置机器ID
+            self.log("1. 重置机器ID...")
+            machine_id_file = qoder_support_dir / "machineid"
+            if machine_id_file.exists():
+                new_machine_id = str(uuid.uuid4())
+                _atomic_write_bytes(machine_id_file, new_machine_id.encode())
+                self.log("   机器ID已重置")
 
-            with open(storage_json_file, 'w', encoding='utf-8') as f:
-                json.dump(data, f, indent=4, ensure_ascii=False)
+            # 2. 重置遥测数据
+            self.log("2. 重置遥测数据...")
+            storage_json_file = qoder_support_dir / "User/globalStorage/storage.json"
+            if storage_json_file.exists():
+                data = self._load_storage(storage_json_file)
 
-            self.log("   遥测数据已重置")
+                machine_id_hash = secrets.token_hex(32)
+                device_id = str(uuid.uuid4())
 
-        # 3. 清理缓存
-        self.log("3. 清理缓存数据...")
-        cache_dirs = [
-            "Cache", "blob_storage", "Code Cache", "SharedClientCache",
-            "GPUCache", "DawnGraphiteCache", "DawnWebGPUCache"
-        ]
+                data['telemetry.machineId'] = machine_id_hash
+                data['telemetry.devDeviceId'] = device_id
 
-        cleaned = 0
-        for cache_dir in cache_dirs:
-            cache_path = qoder_support_dir / cache_dir
-            if cache_path.exists():
+                self._save_storage(storage_json_file, data)
+
+                self.log("   遥测数据已重置")
+
+            # 3. 清理缓存
+            self.log("3. 清理缓存数据...")
+
+            # 重命名后交给后台线程删除，这一步只花几次 rename 的时间
+            cleaned = 0
+            for cache_dir in _CACHE_DIRS:
                 try:
-                    shutil.rmtree(cache_path)
+                    _trash_dir(qoder_support_dir / cache_dir)
                     cleaned += 1
-                except:
+                except FileNotFoundError:
                     pass
+                except OSError as e:
+                    self.log(f"   清除失败 {cache_dir}: {e}")
 
-        self.log(f"   已清理 {cleaned} 个缓存目录")
+            self.log(f"   已清理 {cleaned} 个缓存目录")
         
-        # 4. 清理身份识别文件（新增）
-        self.log("4. 清理身份识别文件...")
-        identity_files = [
-            "Network Persistent State",
-            "Cookies", "Cookies-journal",
-            "SharedStorage", "SharedStorage-wal",
-            "Trust Tokens", "Trust Tokens-journal",
-            "TransportSecurity",
-            "Preferences",
-            "Local State",  # 包含加密密钥，极其重要！
-            "NetworkDataMigrated"  # 网络数据迁移标记
-        ]
+            # 4. 清理身份识别文件（新增）
+            self.log("4. 清理身份识别文件...")
+
+            # 同目录文件批量 unlinkat（打开一次目录 fd），缺失文件走 EAFP
+            deleted, errors = _unlink_many(qoder_support_dir, _IDENTITY_FILES)
+            identity_cleaned = len(deleted)
+            for identity_file, e in errors:
+                self.log(f"   清除失败 {identity_file}: {e}")
+            if deleted:
+                self.log(f"   已清除 {len(deleted)}/{len(_IDENTITY_FILES)}: {', '.join(deleted)}")
+
+            # 专门处理 Network 目录中的文件
+            deleted, errors = _unlink_many(qoder_support_dir / "Network",
+                                           _NETWORK_IDENTITY_FILES)
+            identity_cleaned += len(deleted)
+            for network_file, e in errors:
+                self.log(f"   清除失败 Network/{network_file}: {e}")
+            if deleted:
+                self.log(f"   已清除 Network/: {', '.join(deleted)}")
         
-        identity_cleaned = 0
-        for identity_file in identity_files:
-            file_path = qoder_support_dir / identity_file
-            if file_path.exists():
-                try:
-                    file_path.unlink()
-                    self.log(f"   已清除: {identity_file}")
-                    identity_cleaned += 1
-                except Exception as e:
-                    self.log(f"   清除失败 {identity_file}: {e}")
-        
-        # 专门处理 Network 目录中的文件
-        network_dir = qoder_support_dir / "Network"
-        if network_dir.exists():
-            network_files = [
-                "Cookies", "Cookies-journal", 
-                "Network Persistent State",
-                "NetworkDataMigrated",
-                "TransportSecurity",
-                "Trust Tokens", "Trust Tokens-journal"
+            # 5. 清理存储目录
+            storage_dirs = [
+                "Local Storage",
+                "Session Storage", 
+                "WebStorage",
+                "Shared Dictionary",
+                "Service Worker",
+                "clp",  # 剪贴板数据，可能包含敏感信息
+                "logs",  # 日志文件，可能记录用户活动
+                "Backups",  # 备份文件，可能包含历史身份信息
+                "CachedExtensionVSIXs"  # 扩展缓存，显示用户安装的扩展
             ]
-            for network_file in network_files:
-                file_path = network_dir / network_file
-                if file_path.exists():
-                    try:
-                        file_path.unlink()
-                        self.log(f"   已清除: Network/{network_file}")
-                        identity_cleaned += 1
-                    except Exception as e:
-                        self.log(f"   清除失败 Network/{network_file}: {e}")
         
-        # 5. 清理存储目录
-        storage_dirs = [
-            "Local Storage",
-            "Session Storage", 
-            "WebStorage",
-            "Shared Dictionary",
-            "Service Worker",
-            "clp",  # 剪贴板数据，可能包含敏感信息
-            "logs",  # 日志文件，可能记录用户活动
-            "Backups",  # 备份文件，可能包含历史身份信息
-            "CachedExtensionVSIXs"  # 扩展缓存，显示用户安装的扩展
-        ]
-        
-        for storage_dir in storage_dirs:
-            storage_path = qoder_support_dir / storage_dir
-            if storage_path.exists():
-                try:
-                    shutil.rmtree(storage_path)
-                    self.log(f"   已清除: {storage_dir}")
-                    identity_cleaned += 1
-                except Exception as e:
-                    self.log(f"   清除失败 {storage_dir}: {e}")
-        
-        self.log(f"   已清理 {identity_cleaned} 个身份识别文件/目录")
-        
-        # 5. 执行高级身份清理（新增）
-        self.log("5. 执行高级身份清理...")
-        self.perform_advanced_identity_cleanup(qoder_support_dir)
-
-        # 6. 处理对话记录
-        if preserve_chat:
-            self.log("6. 保留对话记录...")
-            self.log("   对话记录已保留")
-        else:
-            self.log("6. 清除对话记录...")
-            self.clear_chat_history(qoder_support_dir)
+            delete_plan = []
+            for storage_dir in storage_dirs:
+                self._queue_delete(delete_plan, 'dir', storage_dir,
+                                   qoder_support_dir / storage_dir)
+
+            self.log(f"   已清理 {identity_cleaned} 个身份识别文件")
+
+            # 5. 执行高级身份清理（新增）
+            self.log("5. 执行高级身份清理...")
+            self.perform_advanced_identity_cleanup(qoder_support_dir,
+                                                   delete_plan)
+
+            # 6. 处理对话记录
+            if preserve_chat:
+                self.log("6. 保留对话记录...")
+                self.log("   对话记录已保留")
+            else:
+                self.log("6. 清除对话记录...")
+                self.clear_chat_history(qoder_support_dir, delete_plan)
+
+            # 7. 统一执行删除计划：同目录文件合并 unlink，目录并行删除，
+            # 重复排入的目标（如 Session Storage）只删一次
+            self.log("7. 执行删除计划...")
+            plan_cleaned = self._execute_delete_plan(delete_plan)
+            self.log(f"   删除计划完成，清除了 {plan_cleaned} 个项目")
 
-    def perform_advanced_identity_cleanup(self, qoder_support_dir):
-        """执行高级身份清理，清除所有可能的身份识别信息"""
+    def perform_advanced_identity_cleanup(self, qoder_support_dir, plan):
+        """收集高级身份清理目标，排入调用方的删除计划"""
         try:
-            self.log("开始高级身份清理...")
-            cleaned_count = 0
-            
-            # 1. 清理 SharedClientCache 内部文件
+            self.log("   收集高级身份清理目标...")
+
+            # 1. SharedClientCache 内部关键文件（保留目录结构本身）
             shared_cache = qoder_support_dir / "SharedClientCache"
-            if shared_cache.exists():
-                # 保留目录结构，但清除关键文件
-                critical_files = [".info", ".lock", "mcp.json"]
-                for file_name in critical_files:
-                    file_path = shared_cache / file_name
-                    if file_path.exists():
-                        try:
-                            file_path.unlink()
-                            self.log(f"   已清除: SharedClientCache/{file_name}")
-                            cleaned_count += 1
-                        except Exception as e:
-                            self.log(f"   清除失败 {file_name}: {e}")
-                
-                # 清理 index 目录（包含索引数据）
-                index_dir = shared_cache / "index"
-                if index_dir.exists():
-                    try:
-                        shutil.rmtree(index_dir)
-                        self.log("   已清除: SharedClientCache/index")
-                        cleaned_count += 1
-                    except Exception as e:
-                        self.log(f"   清除失败 index: {e}")
-                
-                # 清理 cache 目录
-                cache_dir = shared_cache / "cache"
-                if cache_dir.exists():
-                    try:
-                        shutil.rmtree(cache_dir)
-                        self.log("   已清除: SharedClientCache/cache")
-                        cleaned_count += 1
-                    except Exception as e:
-                        self.log(f"   清除失败 cache: {e}")
-            
-            # 2. 清理系统级别的身份文件
-            system_files = [
-                "code.lock",
-                "languagepacks.json"
-            ]
-            
-            for sys_file in system_files:
-                file_path = qoder_support_dir / sys_file
-                if file_path.exists():
-                    try:
-                        file_path.unlink()
-                        self.log(f"   已清除: {sys_file}")
-                        cleaned_count += 1
-                    except Exception as e:
-                        self.log(f"   清除失败 {sys_file}: {e}")
-            
-            # 3. 清理崩溃报告目录（可能包含设备信息）
-            crashpad_dir = qoder_support_dir / "Crashpad"
-            if crashpad_dir.exists():
-                try:
-                    shutil.rmtree(crashpad_dir)
-                    self.log("   已清除: Crashpad")
-                    cleaned_count += 1
-                except Exception as e:
-                    self.log(f"   清除失败 Crashpad: {e}")
-            
-            # 4. 清理缓存目录（CachedData和 CachedProfilesData）
-            cached_dirs = ["CachedData", "CachedProfilesData"]
-            for cached_dir in cached_dirs:
-                dir_path = qoder_support_dir / cached_dir
-                if dir_path.exists():
-                    try:
-                        shutil.rmtree(dir_path)
-                        self.log(f"   已清除: {cached_dir}")
-                        cleaned_count += 1
-                    except Exception as e:
-                        self.log(f"   清除失败 {cached_dir}: {e}")
-            
-            # 5. 清理 socket 文件
-            import glob
-            socket_pattern = str(qoder_support_dir / "*.sock")
-            socket_files = glob.glob(socket_pattern)
-            for socket_file in socket_files:
-                try:
-                    Path(socket_file).unlink()
-                    self.log(f"   已清除: {Path(socket_file).name}")
-                    cleaned_count += 1
-                except Exception as e:
-                    self.log(f"   清除失败 {Path(socket_file).name}: {e}")
-            
-            self.log(f"   高级身份清理完成，处理了 {cleaned_count} 个项目")
-            
+            for file_name in (".info", ".lock", "mcp.json"):
+                self._queue_delete(plan, 'file',
+                                   f"SharedClientCache/{file_name}",
+                                   shared_cache / file_name)
+
+            # 2. 系统级别的身份文件
+            for sys_file in ("code.lock", "languagepacks.json"):
+                self._queue_delete(plan, 'file', sys_file,
+                                   qoder_support_dir / sys_file)
+
+            # 3. 互不嵌套的缓存/崩溃报告目录：SharedClientCache 的
+            # index/cache、崩溃报告 Crashpad、以及 CachedData/
+            # CachedProfilesData，执行阶段在线程池里并行删除
+            for label, path in (
+                ("SharedClientCache/index", shared_cache / "index"),
+                ("SharedClientCache/cache", shared_cache / "cache"),
+                ("Crashpad", qoder_support_dir / "Crashpad"),
+                ("CachedData", qoder_support_dir / "CachedData"),
+                ("CachedProfilesData", qoder_support_dir / "CachedProfilesData"),
+            ):
+                self._queue_delete(plan, 'dir', label, path)
+
+            # 4. socket 文件（后缀过滤用一次 scandir 就够，不需要 glob）
+            with os.scandir(qoder_support_dir) as it:
+                for entry in it:
+                    if entry.name.endswith('.sock'):
+                        self._queue_delete(plan, 'file',
+                                           entry.name, entry.path)
+
         except Exception as e:
             self.log(f"   高级身份清理失败: {e}")
 
-    def clear_chat_history(self, qoder_support_dir):
-        """清除对话记录"""
+    def clear_chat_history(self, qoder_support_dir, plan):
+        """清除对话记录，目录目标排入调用方的删除计划"""
         try:
             cleared = 0
 
             # 1. 清除工作区中的对话会话
             workspace_storage = qoder_support_dir / "User/workspaceStorage"
-            if workspace_storage.exists():
-                for workspace_dir in workspace_storage.iterdir():
-                    if workspace_dir.is_dir():
-                        # 清除chatSessions目录
-                        chat_sessions = workspace_dir / "chatSessions"
-                        if chat_sessions.exists():
-                            try:
-                                shutil.rmtree(chat_sessions)
-                                self.log(f"   已清除: {chat_sessions.relative_to(qoder_support_dir)}")
-                                cleared += 1
-                            except Exception as e:
-                                self.log(f"   清除失败 {chat_sessions.relative_to(qoder_support_dir)}: {e}")
-
-                        # 清除chatEditingSessions目录
-                        chat_editing = workspace_dir / "chatEditingSessions"
-                        if chat_editing.exists():
-                            try:
-                                shutil.rmtree(chat_editing)
-                                self.log(f"   已清除: {chat_editing.relative_to(qoder_support_dir)}")
-                                cleared += 1
-                            except Exception as e:
-                                self.log(f"   清除失败 {chat_editing.relative_to(qoder_support_dir)}: {e}")
+            # 日志里的相对路径用字符串切片得出，循环里不再构造 PurePath
+            base = str(qoder_support_dir) + os.sep
+            # scandir 的 DirEntry.is_dir() 直接用 readdir 的 d_type，
+            # 不用像 pathlib.iterdir + is_dir() 那样每个条目多一次 stat
+            try:
+                with os.scandir(workspace_storage) as it:
+                    workspace_entries = [entry for entry in it
+                                         if entry.is_dir(follow_symlinks=False)]
+            except FileNotFoundError:
+                workspace_entries = []
+            for entry in workspace_entries:
+                # chatSessions / chatEditingSessions 排入统一计划
+                chat_sessions = os.path.join(entry.path, "chatSessions")
+                self._queue_delete(plan, 'dir', chat_sessions[len(base):],
+                                   chat_sessions)
+                chat_editing = os.path.join(entry.path, "chatEditingSessions")
+                self._queue_delete(plan, 'dir', chat_editing[len(base):],
+                                   chat_editing)
 
             # 2. 清除历史记录
-            history_dir = qoder_support_dir / "User/History"
-            if history_dir.exists():
-                try:
-                    shutil.rmtree(history_dir)
-                    self.log(f"   已清除: User/History")
-                    cleared += 1
-                except Exception as e:
-                    self.log(f"   清除失败 User/History: {e}")
+            self._queue_delete(plan, 'dir', "User/History",
+                               qoder_support_dir / "User/History")
 
             # 3. 清除会话存储中的对话相关数据
-            session_storage = qoder_support_dir / "Session Storage"
-            if session_storage.exists():
-                try:
-                    shutil.rmtree(session_storage)
-                    self.log(f"   已清除: Session Storage")
-                    cleared += 1
-                except Exception as e:
-                    self.log(f"   清除失败 Session Storage: {e}")
+            # （完整重置时已在存储目录列表里，执行阶段会去重）
+            self._queue_delete(plan, 'dir', "Session Storage",
+                               qoder_support_dir / "Session Storage")
 
             # 4. 清除用户数据中的对话相关配置
             user_data_file = qoder_support_dir / "User/globalStorage/storage.json"
-            if user_data_file.exists():
-                try:
-                    with open(user_data_file, 'r', encoding='utf-8') as f:
-                        data = json.load(f)
+            try:
+                with open(user_data_file, 'rb') as f:
+                    raw = f.read()
+
+                # 先用正则粗扫原始字节：没有疑似对话键就直接跳过，
+                # 省掉整棵 JSON 树的解析和重新序列化（首次清理后的常态）
+                if re.search(rb'"[^"]*(?:chat|conversation|history|session)'
+                             rb'[^"]*"\s*:', raw, re.IGNORECASE):
+                    if orjson is not None:
+                        data = orjson.loads(raw)
+                    else:
+                        data = json.loads(raw)
 
                     # 清除对话相关的键
-                    chat_keys = [key for key in data.keys() if
-                               'chat' in key.lower() or
-                               'conversation' in key.lower() or
-                               'history' in key.lower() or
-                               'session' in key.lower()]
+                    chat_keys = [key for key in data if _CHAT_RE.search(key)]
 
                     if chat_keys:
                         for key in chat_keys:
                             del data[key]
                             self.log(f"   已清除配置: {key}")
 
-                        with open(user_data_file, 'w', encoding='utf-8') as f:
-                            json.dump(data, f, indent=4, ensure_ascii=False)
-
-                        cleared += 1
+                        _dump_json(user_data_file, data)
+                        cleared += len(chat_keys)
 
-                except Exception as e:
-                    self.log(f"   清除用户配置失败: {e}")
+            except FileNotFoundError:
+                pass
+            except Exception as e:
+                self.log(f"   清除用户配置失败: {e}")
 
-            self.log(f"   对话记录清除完成 (处理了 {cleared} 个项目)")
+            self.log(f"   对话目录已排入删除计划，清除配置键 {cleared} 个")
 
         except Exception as e:
             self.log(f"   清除对话记录失败: {e}")
@@ -1095,28 +1455,174 @@ class QoderResetGUI(QMainWindow):
         self.log("打开GitHub链接...")
         webbrowser.open("https://github.com/itandelin/qoder-free")
 
+# 全局样式表：按 objectName 选择器集中声明所有控件样式。
+# Qt 只解析一次，比给每个控件单独 setStyleSheet（每次都触发完整的
+# CSS 解析和样式树重建）快得多
+_GLOBAL_QSS = """
+QMainWindow {
+    background-color: white;
+}
+#titleLabel {
+    font-size: 24px;
+    font-weight: bold;
+    color: black;
+    margin-bottom: 10px;
+}
+#introLabel {
+    font-size: 12px;
+    color: #666666;
+    margin-bottom: 20px;
+}
+#operationTitle {
+    font-size: 14px;
+    font-weight: bold;
+    color: black;
+    margin-bottom: 10px;
+}
+#logTitle {
+    font-size: 14px;
+    font-weight: bold;
+    color: black;
+    margin-top: 10px;
+    margin-bottom: 10px;
+}
+#oneClickBtn {
+    background-color: #4285f4;
+    color: white;
+    font-size: 14px;
+    font-weight: bold;
+    border: none;
+    border-radius: 5px;
+}
+#oneClickBtn:hover {
+    background-color: #3367d6;
+}
+#oneClickBtn:pressed {
+    background-color: #2851a3;
+}
+#closeQoderBtn {
+    background-color: #ea4335;
+    color: white;
+    font-size: 12px;
+    font-weight: bold;
+    border: none;
+    border-radius: 5px;
+}
+#closeQoderBtn:hover {
+    background-color: #d33b2c;
+}
+#closeQoderBtn:pressed {
+    background-color: #b52d20;
+}
+#resetMachineIdBtn, #resetTelemetryBtn {
+    background-color: #4285f4;
+    color: white;
+    font-size: 12px;
+    font-weight: bold;
+    border: none;
+    border-radius: 5px;
+}
+#resetMachineIdBtn:hover, #resetTelemetryBtn:hover {
+    background-color: #3367d6;
+}
+#resetMachineIdBtn:pressed, #resetTelemetryBtn:pressed {
+    background-color: #2851a3;
+}
+#deepCleanBtn {
+    background-color: #ff9800;
+    color: white;
+    font-size: 12px;
+    font-weight: bold;
+    border: none;
+    border-radius: 5px;
+}
+#deepCleanBtn:hover {
+    background-color: #f57c00;
+}
+#deepCleanBtn:pressed {
+    background-color: #e65100;
+}
+#preserveChatCheckbox {
+    color: black;
+    font-size: 12px;
+    font-weight: bold;
+    spacing: 8px;
+}
+#preserveChatCheckbox::indicator {
+    width: 16px;
+    height: 16px;
+    border: 2px solid #4285f4;
+    border-radius: 3px;
+    background-color: white;
+}
+#preserveChatCheckbox::indicator:checked {
+    background-color: #4285f4;
+    border: 2px solid #4285f4;
+}
+#preserveChatCheckbox::indicator:checked:hover {
+    background-color: #3367d6;
+    border: 2px solid #3367d6;
+}
+#logText {
+    background-color: #f8f9fa;
+    color: #333333;
+    border: 1px solid #dadce0;
+    border-radius: 5px;
+    font-family: 'Monaco', 'Menlo', 'Courier New', monospace;
+    font-size: 11px;
+    padding: 10px;
+}
+#clearLogBtn {
+    background-color: #9aa0a6;
+    color: white;
+    font-size: 11px;
+    font-weight: bold;
+    border: none;
+    border-radius: 5px;
+}
+#clearLogBtn:hover {
+    background-color: #80868b;
+}
+#clearLogBtn:pressed {
+    background-color: #5f6368;
+}
+#githubBtn {
+    background-color: #333333;
+    color: white;
+    font-size: 11px;
+    font-weight: bold;
+    border: none;
+    border-radius: 5px;
+}
+#githubBtn:hover {
+    background-color: #555555;
+}
+#githubBtn:pressed {
+    background-color: #222222;
+}
+QMessageBox {
+    background-color: white;
+    color: black;
+}
+QMessageBox QLabel {
+    color: black;
+}
+QMessageBox QPushButton {
+    background-color: white;
+    color: black;
+    border: 1px solid #ccc;
+    padding: 5px 15px;
+}
+"""
+
 def main():
     app = QApplication(sys.argv)
 
     # 设置应用程序样式
     app.setStyle('Fusion')
 
-    # 设置全局样式表，确保对话框文字和按钮可见
-    app.setStyleSheet("""
-        QMessageBox {
-            background-color: white;
-            color: black;
-        }
-        QMessageBox QLabel {
-            color: black;
-        }
-        QMessageBox QPushButton {
-            background-color: white;
-            color: black;
-            border: 1px solid #ccc;
-            padding: 5px 15px;
-        }
-    """)
+    # 全局样式表一次性设置（含对话框文字和按钮的可见性样式）
+    app.setStyleSheet(_GLOBAL_QSS)
 
     window = QoderResetGUI()
     window.show()